@@ -0,0 +1,172 @@
+import mmap
+import os
+import pickle
+import re
+from collections import Counter
+from datetime import datetime, timedelta
+
+from logger import logger
+
+# Tones offered by the generator; always listed in the analytics tone usage
+_DEFAULT_TONES = ("Formal", "Friendly", "Startup")
+
+# Log line patterns for the analytics parser. They run over the whole mapped
+# log in one pass each; every match is a line starting with its timestamp
+# (group 1, in the fixed-width "YYYY-MM-DD HH:MM:SS" format)
+_LINE_PREFIX = rb"^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})[^\n]*?"
+_GENERATION_RE = re.compile(
+    _LINE_PREFIX + rb"Generating email for company=([^,\n]*)", re.MULTILINE
+)
+_SEND_RE = re.compile(
+    _LINE_PREFIX + rb"(?:Email successfully sent to|Email sent \|)", re.MULTILINE
+)
+_TONE_RE = re.compile(_LINE_PREFIX + rb"tone=([^|\s]+)", re.MULTILINE)
+
+# Bumped whenever the layout of the pickled analytics state changes
+_ANALYTICS_STATE_VERSION = 2
+
+
+def _new_analytics_state() -> dict:
+    """Return empty state for the incremental log parser."""
+    return {
+        "version": _ANALYTICS_STATE_VERSION,
+        "inode": None,
+        "offset": 0,
+        "total_emails_generated": 0,
+        "total_emails_sent": 0,
+        "send_times": [],
+        "company_counter": Counter(),
+        "tone_counter": Counter(),
+    }
+
+
+def _load_analytics_state(state_path: str) -> dict:
+    """Load the pickled parser state, starting fresh if it is missing or unreadable."""
+    try:
+        with open(state_path, "rb") as f:
+            state = pickle.load(f)
+    except FileNotFoundError:
+        return _new_analytics_state()
+    except Exception:
+        logger.exception("Discarding unreadable analytics state in %s", state_path)
+        return _new_analytics_state()
+    # State written by an older parser may hold differently typed values
+    if state.get("version") != _ANALYTICS_STATE_VERSION:
+        return _new_analytics_state()
+    return state
+
+
+def _save_analytics_state(state_path: str, state: dict) -> None:
+    """Atomically persist the parser state next to the log file."""
+    tmp_path = f"{state_path}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(state, f)
+    os.replace(tmp_path, state_path)
+
+
+def _scan_log(mm: mmap.mmap, start: int, end: int, state: dict) -> None:
+    """Add the generations, sends and tones logged in ``mm[start:end]`` to ``state``.
+
+    Lines are matched directly in the mapped bytes; only captured groups are
+    decoded. The fixed-width timestamp orders lexicographically, so send
+    times are kept as strings and compared against the window bounds.
+    """
+    for match in _GENERATION_RE.finditer(mm, start, end):
+        state["total_emails_generated"] += 1
+        company = match.group(2).decode("utf-8", errors="replace").strip()
+        if company:
+            state["company_counter"][company] += 1
+
+    for match in _SEND_RE.finditer(mm, start, end):
+        state["total_emails_sent"] += 1
+        state["send_times"].append(match.group(1).decode())
+
+    for match in _TONE_RE.finditer(mm, start, end):
+        tone = match.group(2).decode("utf-8", errors="replace")
+        state["tone_counter"][tone.strip()] += 1
+
+
+def parse_analytics_from_logs(log_file_path: str = "logs/app.log") -> dict:
+    """Parse log file and extract analytics metrics.
+
+    Parsing is incremental: the byte offset reached and the running counters
+    are pickled to ``analytics_state.pkl`` beside the log, so each call only
+    scans lines appended since the previous one. Results are cached for 30
+    seconds by the app on top of that.
+
+    Returns a dictionary with:
+    - total_emails_generated: int
+    - total_emails_sent: int
+    - emails_sent_today: int
+    - emails_sent_this_week: int
+    - tone_usage: dict[str, int] (defaults to empty if not found in logs)
+    - top_companies: list[tuple[str, int]] (company name, count)
+    """
+    metrics = {
+        "total_emails_generated": 0,
+        "total_emails_sent": 0,
+        "emails_sent_today": 0,
+        "emails_sent_this_week": 0,
+        "tone_usage": dict.fromkeys(_DEFAULT_TONES, 0),
+        "top_companies": [],
+    }
+
+    if not os.path.exists(log_file_path):
+        return metrics
+
+    now = datetime.now()
+    today_str = now.date().isoformat()
+    week_ago_str = (now - timedelta(days=7)).strftime("%Y-%m-%d %H:%M:%S")
+
+    state_path = os.path.join(os.path.dirname(log_file_path), "analytics_state.pkl")
+
+    try:
+        state = _load_analytics_state(state_path)
+        # A new inode or a shorter file means the log was rotated: keep the
+        # counters gathered so far and read the new file from the start
+        log_stat = os.stat(log_file_path)
+        if state["inode"] != log_stat.st_ino or log_stat.st_size < state["offset"]:
+            state["inode"] = log_stat.st_ino
+            state["offset"] = 0
+
+        with open(log_file_path, "rb") as f:
+            # Only complete lines are parsed; a partially written last line
+            # is left for the next call
+            start = state["offset"]
+            end = start
+            if log_stat.st_size > start:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    end = mm.rfind(b"\n", start) + 1 or start
+                    if end > start:
+                        _scan_log(mm, start, end, state)
+            state["offset"] = end
+
+        # Sends older than a week no longer affect any metric
+        state["send_times"] = [t for t in state["send_times"] if t >= week_ago_str]
+        _save_analytics_state(state_path, state)
+
+        metrics["total_emails_generated"] = state["total_emails_generated"]
+        metrics["total_emails_sent"] = state["total_emails_sent"]
+        metrics["emails_sent_today"] = sum(
+            1 for t in state["send_times"] if t[:10] == today_str
+        )
+        metrics["emails_sent_this_week"] = len(state["send_times"])
+
+        # Count top companies
+        metrics["top_companies"] = state["company_counter"].most_common(10)
+
+        # Default tones first (present even when unused), then any other
+        # tones found in logs
+        tone_counts = state["tone_counter"]
+        metrics["tone_usage"] = {
+            tone: tone_counts.get(tone, 0) for tone in _DEFAULT_TONES
+        } | {
+            tone: count
+            for tone, count in tone_counts.items()
+            if tone not in _DEFAULT_TONES
+        }
+
+    except Exception as e:
+        logger.exception("Error parsing analytics from log file: %s", e)
+
+    return metrics
@@ -1,118 +1,242 @@
+import asyncio
+import atexit
+import contextlib
 import os
-import re
-from collections import Counter
-from datetime import datetime, timedelta
+import tempfile
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable
 
-import requests
 import streamlit as st
 from dotenv import load_dotenv
 
 from email_utils import is_valid_email, send_email
-from generate_email import generate_email
 from logger import logger
 
+# requests and generate_email are imported lazily on the generate path
 
+load_dotenv()
+
+# Sender account used for outgoing mail; env vars do not change while the app runs
+EMAIL_ADDRESS = os.getenv("EMAIL_ADDRESS", "")
+EMAIL_PASSWORD = os.getenv("EMAIL_PASSWORD", "")
+
+
+# Static page markup rendered by main() and the generator page
+_HEADER_HTML = """<div class="main-header">
+	<div class="header-left">
+		<h1>📧 AI Cold Email Generator</h1>
+		<p>Powered by Mistral API</p>
+	</div>
+	<a href="https://github.com/Siddharth1254/ai-cold-email-generator.git" target="_blank" class="github-link">View on GitHub</a>
+</div>
+"""
+
+_PLACEHOLDER_HTML = """<div class="placeholder-container">
+	<div class="placeholder-icon">✉️</div>
+	<h3>No email generated yet</h3>
+	<p>Fill in the details on the left and click "Generate Email" to create your cold email.</p>
+</div>
+"""
+
+# Page stylesheet, emitted by main() on every rerun
+_CSS_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "static", "app.css"
+)
+
+# Maps the separators in an email local part to spaces ("jane.doe" -> "jane doe")
+_SENDER_NAME_TRANS = str.maketrans("._", "  ")
+
+# Initial values for the email generator's session_state keys
+_SESSION_DEFAULTS = {
+    "receiver_email": "",
+    "generated_subject": "",
+    "generated_body": "",
+    "attachment_file": None,
+    "how_found": "",
+    "one_liner": "",
+    "company_note": "",
+    "tone": "Formal",
+}
+
+# Tones offered by the tone selector
+_TONES = ("Formal", "Friendly", "Startup")
+
+# Number of alternatives produced by the "Generate variants" button
+_VARIANT_COUNT = 5
+
+
+@st.cache_data(ttl=30, show_spinner=False)
 def _parse_analytics_from_logs(log_file_path: str = "logs/app.log") -> dict:
-    """Parse log file and extract analytics metrics.
-
-    Returns a dictionary with:
-    - total_emails_generated: int
-    - total_emails_sent: int
-    - emails_sent_today: int
-    - emails_sent_this_week: int
-    - tone_usage: dict[str, int] (defaults to empty if not found in logs)
-    - top_companies: list[tuple[str, int]] (company name, count)
+    """Return the log-derived dashboard metrics, recomputed at most every 30s."""
+    # Imported here so the generator page never loads the analytics code
+    from analytics import parse_analytics_from_logs
+
+    return parse_analytics_from_logs(log_file_path)
+
+
+@st.cache_resource
+def _generation_executor() -> ThreadPoolExecutor:
+    """Return the shared worker pool that runs Mistral calls off the script thread."""
+    return ThreadPoolExecutor(max_workers=4, thread_name_prefix="generate-email")
+
+
+def _normalize_field(value: str | None) -> str | None:
+    """Collapse runs of whitespace so near-identical inputs share a cache entry."""
+    if not value:
+        return None
+    return " ".join(value.split()) or None
+
+
+@st.cache_data(ttl=24 * 60 * 60, show_spinner=False)
+def _cached_generate_email(
+    company: str,
+    role: str,
+    sender_email: str,
+    receiver_email: str,
+    position: str | None,
+    sender_name: str,
+    how_found: str | None,
+    one_liner: str | None,
+    company_note: str | None,
+    tone: str,
+    seed: int | None = None,
+    _on_delta: Callable[[str], None] | None = None,
+) -> dict[str, str]:
+    """Generate an email, reusing the previous result for identical inputs.
+
+    Streamlit keys the cache on the argument values, so regenerating with the
+    same (normalized) form contents skips the Mistral round-trip for a day.
+    Unseeded results are also kept by persistent_cache, so they survive a
+    restart. ``_on_delta`` (excluded from the key) receives streamed text on a miss.
     """
-    metrics = {
-        "total_emails_generated": 0,
-        "total_emails_sent": 0,
-        "emails_sent_today": 0,
-        "emails_sent_this_week": 0,
-        "tone_usage": {"Formal": 0, "Friendly": 0, "Startup": 0},
-        "top_companies": [],
-    }
+    import persistent_cache
+    from generate_email import generate_email
+
+    # Every input is part of the key. Seeded variants are meant to differ,
+    # so they bypass the persistent cache.
+    cache_fields = (
+        company,
+        role,
+        position,
+        sender_email,
+        receiver_email,
+        sender_name,
+        tone,
+        how_found,
+        one_liner,
+        company_note,
+    )
+    if seed is None:
+        hit = persistent_cache.get(cache_fields)
+        if hit is not None:
+            subject, body = hit
+            return {"subject": subject, "body": body}
+
+    result = generate_email(
+        company=company,
+        role=role,
+        sender_email=sender_email,
+        receiver_email=receiver_email,
+        position=position,
+        sender_name=sender_name,
+        how_found=how_found,
+        one_liner=one_liner,
+        company_note=company_note,
+        tone=tone,
+        seed=seed,
+        on_delta=_on_delta,
+    )
+    if seed is None:
+        persistent_cache.put(cache_fields, result["subject"], result["body"])
+    return result
 
-    if not os.path.exists(log_file_path):
-        return metrics
 
-    now = datetime.now()
-    today = now.date()
-    week_ago = now - timedelta(days=7)
+def _generate_logged(**fields) -> dict[str, str]:
+    """Call ``_cached_generate_email`` for one email, logging its tone for the analytics.
 
-    companies = []
-    tone_counts = {"Formal": 0, "Friendly": 0, "Startup": 0}
+    The tone line is logged here rather than in generate_email, so Streamlit
+    cache hits are counted as tone usage just like the generation itself.
+    """
+    result = _cached_generate_email(**fields)
+    logger.info("Email generated | tone=%s", fields["tone"])
+    return result
 
-    try:
-        with open(log_file_path, "r", encoding="utf-8") as f:
-            for line in f:
-                # Parse date from log line (format: YYYY-MM-DD HH:MM:SS,mmm)
-                date_match = re.match(r"(\d{4}-\d{2}-\d{2}) (\d{2}:\d{2}:\d{2})", line)
-                if date_match:
-                    date_str = date_match.group(1)
-                    time_str = date_match.group(2)
-                    try:
-                        log_date = datetime.strptime(
-                            f"{date_str} {time_str}", "%Y-%m-%d %H:%M:%S"
-                        ).date()
-                        log_datetime = datetime.strptime(
-                            f"{date_str} {time_str}", "%Y-%m-%d %H:%M:%S"
-                        )
-                    except ValueError:
-                        continue
-                else:
-                    continue
-
-                # Count email generations
-                if "Generating email for company=" in line:
-                    metrics["total_emails_generated"] += 1
-                    # Extract company name
-                    company_match = re.search(r"company=([^,]+)", line)
-                    if company_match:
-                        company = company_match.group(1).strip()
-                        companies.append(company)
-
-                # Count email sends
-                if "Email successfully sent to" in line or "Email sent |" in line:
-                    metrics["total_emails_sent"] += 1
-                    if log_date == today:
-                        metrics["emails_sent_today"] += 1
-                    if log_datetime >= week_ago:
-                        metrics["emails_sent_this_week"] += 1
-
-                # Extract tone from log lines
-                if "tone=" in line:
-                    tone_match = re.search(r"tone=([^|\s]+)", line)
-                    if tone_match:
-                        tone = tone_match.group(1).strip()
-                        # Initialize tone if not in dict, then increment
-                        if tone not in tone_counts:
-                            tone_counts[tone] = 0
-                        tone_counts[tone] += 1
-
-        # Count top companies
-        company_counts = Counter(companies)
-        metrics["top_companies"] = company_counts.most_common(10)
-
-        # Update tone_usage with parsed counts, ensuring all default tones are present
-        for default_tone in metrics["tone_usage"]:
-            metrics["tone_usage"][default_tone] = tone_counts.get(default_tone, 0)
-        # Also include any additional tones found in logs
-        for tone, count in tone_counts.items():
-            if tone not in metrics["tone_usage"]:
-                metrics["tone_usage"][tone] = count
-
-    except Exception as e:
-        logger.exception("Error parsing analytics from log file: %s", e)
-
-    return metrics
+
+def _apply_variant() -> None:
+    """Copy the variant picked in the selector into the editable subject/body."""
+    variant = st.session_state["generated_variants"][st.session_state["variant_index"]]
+    st.session_state["generated_subject"] = variant["subject"]
+    st.session_state["generated_body"] = variant["body"]
+
+
+def _classify_api_error(exc: Exception) -> str:
+    """Map a generation failure to the message shown to the user.
+
+    HTTP failures are classified by status code (``HTTPError.response`` or
+    ``MistralAPIError.status_code``) so the error body is never stringified.
+    """
+    status_code = getattr(getattr(exc, "response", None), "status_code", None)
+    if status_code is None:
+        status_code = getattr(exc, "status_code", None)
+    if status_code == 429:
+        return "🚦 Mistral API is temporarily overloaded. Please try again in a few minutes."
+    if status_code is not None:
+        return f"Failed to generate email: Mistral API returned HTTP {status_code}."
+    return f"Failed to generate email: {exc}"
+
+
+@st.cache_resource
+def _attachment_temp_paths() -> set[str]:
+    """Track attachment temp files written by this process; removed at exit."""
+    paths: set[str] = set()
+
+    def _cleanup() -> None:
+        for path in list(paths):
+            with contextlib.suppress(OSError):
+                os.remove(path)
+
+    atexit.register(_cleanup)
+    return paths
+
+
+def _spool_attachment(uploaded_file) -> dict[str, str]:
+    """Write an upload to a temp file and return its metadata.
+
+    Only the metadata is kept in session state; the bytes are read back from
+    disk when the email is sent.
+    """
+    suffix = os.path.splitext(uploaded_file.name)[1]
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tf:
+        tf.write(uploaded_file.getbuffer())
+    _attachment_temp_paths().add(tf.name)
+    return {
+        "file_id": uploaded_file.file_id,
+        "path": tf.name,
+        "name": uploaded_file.name,
+        "mime": uploaded_file.type,
+    }
+
+
+def _discard_attachment(attachment: dict[str, str] | None) -> None:
+    """Delete the temp file behind a previously spooled attachment."""
+    if not attachment:
+        return
+    _attachment_temp_paths().discard(attachment["path"])
+    with contextlib.suppress(OSError):
+        os.remove(attachment["path"])
 
 
 def _send_email_ui(
-    receiver: str, subject: str, body: str, file=None, tone: str = "Formal"
+    receiver: str,
+    subject: str,
+    body: str,
+    attachment: dict[str, str] | None = None,
+    tone: str = "Formal",
 ) -> None:
     """Handle the email sending UI and logic."""
-    email_address = os.getenv("EMAIL_ADDRESS", "")
-    email_password = os.getenv("EMAIL_PASSWORD", "")
+    email_address = EMAIL_ADDRESS
+    email_password = EMAIL_PASSWORD
 
     if not email_address:
         logger.error("EMAIL_ADDRESS env var missing; cannot send email.")
@@ -129,16 +253,22 @@ def _send_email_ui(
     logger.info("Attempting to send email to %s", receiver)
     with st.spinner("Sending email..."):
         try:
-            ok, message = send_email(
-                sender=email_address,
-                receiver=receiver,
-                subject=subject,
-                body=body,
-                password=email_password,
-                file=file,
-            )
+            with (
+                open(attachment["path"], "rb")
+                if attachment
+                else contextlib.nullcontext()
+            ) as file:
+                ok, message = send_email(
+                    sender=email_address,
+                    receiver=receiver,
+                    subject=subject,
+                    body=body,
+                    password=email_password,
+                    file=file,
+                    filename=attachment["name"] if attachment else None,
+                )
             if ok:
-                logger.info(f"Email sent | tone={tone} | recipient={receiver}")
+                logger.info("Email sent | tone=%s | recipient=%s", tone, receiver)
                 st.success(message or f"✅ Email sent successfully to {receiver}!")
         except ValueError as e:
             logger.exception("Validation error while sending email to %s", receiver)
@@ -146,82 +276,107 @@ def _send_email_ui(
         except RuntimeError as e:
             logger.exception("Runtime error while sending email to %s", receiver)
             st.error(f"❌ {e}")
-        except Exception:
-            logger.exception("Unexpected failure while sending email to %s", receiver)
-            st.error("❌ Failed to send email due to an unexpected error.")
+        except OSError:
+            logger.exception("Attachment temp file unavailable for %s", receiver)
+            st.error(
+                "❌ The attachment is no longer available. Please upload it again."
+            )
+
+
+@st.cache_data(show_spinner=False)
+def _load_css(mtime: float) -> str:
+    """Return static/app.css wrapped in a <style> tag; ``mtime`` keys the cache."""
+    with open(_CSS_PATH, encoding="utf-8") as f:
+        return f"<style>\n{f.read()}</style>\n"
+
+
+def _page_style() -> str:
+    """Return the page stylesheet, re-reading the file only after it changes."""
+    return _load_css(os.path.getmtime(_CSS_PATH))
+
+
+def _update_if_changed(key: str, value) -> None:
+    """Write a session_state value only when it differs from the stored one."""
+    if st.session_state.get(key) != value:
+        st.session_state[key] = value
+
+
+@st.cache_data(show_spinner=False)
+def _default_sender_name(email: str) -> str:
+    """Derive a display name from the local part of an email address."""
+    local_part = email.split("@", 1)[0]
+    return local_part.translate(_SENDER_NAME_TRANS).title()
+
+
+def _store_generated(result: dict[str, str]) -> None:
+    """Load a generated email into the editable subject/body fields."""
+    st.session_state["generated_subject"] = result.get("subject", "").strip()
+    st.session_state["generated_body"] = result.get("body", "").strip()
+
+
+def _finish_generation(future: "Future[dict[str, str]]") -> None:
+    """Consume a completed generation future and report its outcome."""
+    import requests
+
+    st.session_state.pop("generation_future", None)
+    st.session_state.pop("generation_chunks", None)
+    previous_email = st.session_state.pop("previous_email", None)
+    try:
+        _store_generated(future.result())
+        st.success("Generated — edit below if needed")
+    except (
+        requests.exceptions.RequestException,
+        RuntimeError,
+        ValueError,
+    ) as e:
+        logger.exception("Error while generating email.")
+        st.error(_classify_api_error(e))
+        # Put back the email that was in the editor when generation started
+        if previous_email is not None:
+            _store_generated(previous_email)
 
 
 def _render_email_generator() -> None:
     """Render the email generator UI page."""
-    # Initialize sender_name from EMAIL_ADDRESS if not in session state
-    if "sender_name" not in st.session_state:
-        email_address = os.getenv("EMAIL_ADDRESS", "")
-        if email_address:
-            local_part = email_address.split("@")[0]
-            sender_name_default = local_part.replace(".", " ").replace("_", " ").title()
-            st.session_state["sender_name"] = sender_name_default
-        else:
-            st.session_state["sender_name"] = ""
-
-    # Initialize sender_email and generated email session state
-    if "sender_email" not in st.session_state:
-        st.session_state["sender_email"] = os.getenv("EMAIL_ADDRESS", "")
-    if "receiver_email" not in st.session_state:
-        st.session_state["receiver_email"] = ""
-    if "generated_subject" not in st.session_state:
-        st.session_state["generated_subject"] = ""
-    if "generated_body" not in st.session_state:
-        st.session_state["generated_body"] = ""
-    if "uploaded_file" not in st.session_state:
-        st.session_state["uploaded_file"] = None
-    if "how_found" not in st.session_state:
-        st.session_state["how_found"] = ""
-    if "one_liner" not in st.session_state:
-        st.session_state["one_liner"] = ""
-    if "company_note" not in st.session_state:
-        st.session_state["company_note"] = ""
-    if "tone" not in st.session_state:
-        st.session_state["tone"] = "Formal"
+    # Initialize session state: sender_email / sender_name from EMAIL_ADDRESS,
+    # everything else from _SESSION_DEFAULTS
+    sender_defaults = {
+        "sender_email": EMAIL_ADDRESS,
+        "sender_name": _default_sender_name(EMAIL_ADDRESS),
+    }
+    for key, value in {**sender_defaults, **_SESSION_DEFAULTS}.items():
+        st.session_state.setdefault(key, value)
 
     left_col, right_col = st.columns([4, 6], gap="large")
 
+    # Create the right column's slots up front so a generation started from
+    # the left column can stream its text straight into the preview
+    with right_col:
+        st.subheader("📝 Preview & Send")
+        variant_slot = st.empty()
+        # Single slot holding the placeholder, the streaming text or the
+        # editor, so the placeholder is only rendered while nothing exists
+        preview_slot = st.empty()
+
     # Left column: inputs and generate button
     with left_col:
         # Tone Selector
         st.markdown("### Tone:")
 
-        tone_col1, tone_col2, tone_col3 = st.columns(3)
-
-        if "tone" not in st.session_state:
-            st.session_state["tone"] = "Formal"
-
         def select_tone(t):
             st.session_state["tone"] = t
 
-        with tone_col1:
-            if st.button(
-                "Formal",
-                type="primary" if st.session_state["tone"] == "Formal" else "secondary",
-            ):
-                select_tone("Formal")
-
-        with tone_col2:
-            if st.button(
-                "Friendly",
-                type=(
-                    "primary" if st.session_state["tone"] == "Friendly" else "secondary"
-                ),
-            ):
-                select_tone("Friendly")
-
-        with tone_col3:
-            if st.button(
-                "Startup",
-                type=(
-                    "primary" if st.session_state["tone"] == "Startup" else "secondary"
-                ),
-            ):
-                select_tone("Startup")
+        # on_click updates the tone before the rerun, so the highlight follows
+        # the click immediately and no per-tone markup is rebuilt
+        current_tone = st.session_state["tone"]
+        for tone_col, tone in zip(st.columns(len(_TONES)), _TONES):
+            with tone_col:
+                st.button(
+                    tone,
+                    type="primary" if current_tone == tone else "secondary",
+                    on_click=select_tone,
+                    args=(tone,),
+                )
 
         with st.form("email_form"):
             # Sender Details
@@ -278,10 +433,20 @@ def _render_email_generator() -> None:
                     key="attachment",
                     label_visibility="collapsed",
                 )
-                if uploaded_file is not None:
-                    st.session_state["uploaded_file"] = uploaded_file
-                else:
-                    st.session_state["uploaded_file"] = None
+                # Spool each new upload to disk once instead of keeping the
+                # UploadedFile (and its bytes) in session state
+                current_attachment = st.session_state.get("attachment_file")
+                if uploaded_file is None:
+                    _discard_attachment(current_attachment)
+                    st.session_state["attachment_file"] = None
+                elif (
+                    not current_attachment
+                    or current_attachment["file_id"] != uploaded_file.file_id
+                ):
+                    _discard_attachment(current_attachment)
+                    st.session_state["attachment_file"] = _spool_attachment(
+                        uploaded_file
+                    )
 
             # Generate button in styled container
             st.markdown(
@@ -290,134 +455,198 @@ def _render_email_generator() -> None:
             generate_clicked: bool = st.form_submit_button(
                 "🚀 Generate Email", type="primary", use_container_width=True
             )
-            st.markdown("</div>", unsafe_allow_html=True)
-
-        # Persist basic fields in session state
-        # Form variables are accessible after form closes
-        try:
-            st.session_state["sender_email"] = sender_email.strip()
-            st.session_state["sender_name"] = sender_name.strip()
-            st.session_state["receiver_email"] = receiver_email.strip()
-            st.session_state["how_found"] = how_found.strip()[:200] if how_found else ""
-            st.session_state["one_liner"] = one_liner.strip()[:200] if one_liner else ""
-            st.session_state["company_note"] = (
-                company_note.strip()[:200] if company_note else ""
+            variants_clicked: bool = st.form_submit_button(
+                f"🎲 Generate {_VARIANT_COUNT} variants", use_container_width=True
             )
-        except NameError:
-            # Variables not yet defined (first run), skip
-            pass
+            st.markdown("</div>", unsafe_allow_html=True)
 
-        if generate_clicked:
-            sender_valid, sender_error = is_valid_email(sender_email.strip())
+        # The form stays usable while a generation is polled, but a second
+        # one would orphan the running future and overwrite previous_email
+        # (the editor keys are already gone), so such submits are ignored;
+        # the "Generating" notice below stays up until the first one ends
+        if (generate_clicked or variants_clicked) and (
+            "generation_future" not in st.session_state
+        ):
+            # Strip each input once; the stripped values are reused for
+            # persistence, validation and the generation request below
+            sender_email = sender_email.strip()
+            sender_name = sender_name.strip()
+            receiver_email = receiver_email.strip()
+            how_found = how_found.strip() if how_found else ""
+            one_liner = one_liner.strip() if one_liner else ""
+            company_note = company_note.strip() if company_note else ""
+
+            # Persist basic fields in session state only on submit; form values
+            # cannot change between submissions, so other reruns skip the writes
+            _update_if_changed("sender_email", sender_email)
+            _update_if_changed("sender_name", sender_name)
+            _update_if_changed("receiver_email", receiver_email)
+            _update_if_changed("how_found", how_found[:200])
+            _update_if_changed("one_liner", one_liner[:200])
+            _update_if_changed("company_note", company_note[:200])
+
+            sender_valid, sender_error = is_valid_email(sender_email)
             if not sender_valid:
                 st.error(f"Sender email looks invalid: {sender_error}")
                 st.stop()
 
-            receiver_valid, receiver_error = is_valid_email(receiver_email.strip())
+            receiver_valid, receiver_error = is_valid_email(receiver_email)
             if not receiver_valid:
                 st.error(f"Recipient email looks invalid: {receiver_error}")
                 st.stop()
 
-            if not sender_name:
+            fields = {
+                "company": _normalize_field(company_name),
+                "role": _normalize_field(prospect_role),
+                "sender_email": sender_email.lower(),
+                "receiver_email": receiver_email.lower(),
+                "position": _normalize_field(position),
+                "sender_name": _normalize_field(sender_name),
+                "how_found": _normalize_field(how_found),
+                "one_liner": _normalize_field(one_liner),
+                "company_note": _normalize_field(company_note),
+                "tone": st.session_state.get("tone", "Formal"),
+            }
+
+            # Required fields are checked after normalization, so
+            # whitespace-only values are rejected rather than sent as None
+            if not fields["sender_name"]:
                 st.error("Please enter your full name.")
                 st.stop()
 
-            if not company_name:
+            if not fields["company"]:
                 st.error("Please enter a company.")
                 st.stop()
 
-            if not prospect_role:
+            if not fields["role"]:
                 st.error("Please enter a role or team.")
                 st.stop()
 
-            with st.spinner("Generating with Mistral..."):
-                try:
-                    logger.info(
-                        "Generating email for company=%s, role=%s, sender=%s, receiver=%s",
-                        company_name,
-                        prospect_role,
-                        sender_email,
-                        receiver_email,
-                    )
-                    result = generate_email(
-                        company=company_name.strip(),
-                        role=prospect_role.strip(),
-                        sender_email=sender_email.strip(),
-                        receiver_email=receiver_email.strip(),
-                        position=position.strip() if position else None,
-                        sender_name=sender_name.strip(),
-                        how_found=how_found.strip() if how_found else None,
-                        one_liner=one_liner.strip() if one_liner else None,
-                        company_note=company_note.strip() if company_note else None,
-                        tone=st.session_state.get("tone", "Formal"),
-                    )
-                    st.session_state["generated_subject"] = result.get(
-                        "subject", ""
-                    ).strip()
-                    st.session_state["generated_body"] = result.get("body", "").strip()
-                    st.success("Generated — edit below if needed")
-                except requests.exceptions.HTTPError as e:
-                    logger.exception("HTTP error while generating email.")
-                    error_msg = str(e).lower()
-                    if "429" in error_msg or "rate limit" in error_msg:
-                        st.error(
-                            "🚦 Mistral API is temporarily overloaded. Please try again in a few minutes."
-                        )
-                    else:
-                        st.error(f"Failed to generate email: {e}")
-                except RuntimeError as e:
-                    logger.exception("Runtime error while generating email.")
-                    error_msg = str(e).lower()
-                    if "429" in error_msg or "rate limit" in error_msg:
-                        st.error(
-                            "🚦 Mistral API is temporarily overloaded. Please try again in a few minutes."
+            import requests
+
+            logger.info(
+                "Generating email for company=%s, role=%s, sender=%s, receiver=%s",
+                fields["company"],
+                fields["role"],
+                sender_email,
+                receiver_email,
+            )
+            if variants_clicked:
+                from generate_email import agenerate_emails
+
+                with st.spinner("Generating with Mistral..."):
+                    try:
+                        # One Mistral seed per variant; failed variants come
+                        # back as exception instances in their slot
+                        results = asyncio.run(
+                            agenerate_emails(
+                                (
+                                    {**fields, "seed": seed}
+                                    for seed in range(1, _VARIANT_COUNT + 1)
+                                ),
+                                generate=_cached_generate_email,
+                            )
                         )
-                    else:
-                        st.error(f"Failed to generate email: {e}")
-                except Exception:
-                    logger.exception("Unexpected error while generating email.")
-                    st.error("Failed to generate email due to an unexpected error.")
+                        variants = [
+                            {
+                                "subject": r.get("subject", "").strip(),
+                                "body": r.get("body", "").strip(),
+                            }
+                            for r in results
+                            if not isinstance(r, BaseException)
+                        ]
+                        if not variants:
+                            raise results[0]
+                        # One click logs one generation line above, so it
+                        # logs one tone line too, however many variants
+                        logger.info("Email generated | tone=%s", fields["tone"])
+                        st.session_state["generated_variants"] = variants
+                        st.session_state["variant_index"] = 0
+                        _store_generated(variants[0])
+                        st.success("Generated — edit below if needed")
+                    except (
+                        requests.exceptions.RequestException,
+                        RuntimeError,
+                        ValueError,
+                    ) as e:
+                        logger.exception("Error while generating email.")
+                        st.error(_classify_api_error(e))
+            else:
+                # Run the call on the worker pool without waiting for it; the
+                # reruns below poll the future, so the page stays interactive
+                chunks: list[str] = []
+                st.session_state["generation_chunks"] = chunks
+                # The editor is not rendered while the future is polled, so
+                # Streamlit drops its widget keys; keep the current email in
+                # a key no widget owns so a failed generation can restore it
+                st.session_state["previous_email"] = {
+                    "subject": st.session_state.get("generated_subject", ""),
+                    "body": st.session_state.get("generated_body", ""),
+                }
+                st.session_state["generation_future"] = _generation_executor().submit(
+                    _generate_logged, **fields, _on_delta=chunks.append
+                )
+                st.session_state.pop("generated_variants", None)
+
+        # Pick up the result of a generation started by this or an earlier run
+        future = st.session_state.get("generation_future")
+        if future is not None:
+            if future.done():
+                _finish_generation(future)
+            else:
+                st.info("⏳ Generating with Mistral...")
 
     # Right column: editable subject/body and send button
     with right_col:
-        st.subheader("📝 Preview & Send")
-
         receiver_email = st.session_state.get("receiver_email", "")
 
-        # Show placeholder if no email generated
+        variants = st.session_state.get("generated_variants")
+        if variants and len(variants) > 1:
+            variant_slot.selectbox(
+                "Variant",
+                range(len(variants)),
+                format_func=lambda i: f"Variant {i + 1}: {variants[i]['subject']}",
+                key="variant_index",
+                on_change=_apply_variant,
+            )
+
+        if "generation_future" in st.session_state:
+            # Show the text streamed so far until the generation finishes
+            preview_slot.text_area(
+                "Email body",
+                "".join(st.session_state.get("generation_chunks", [])),
+                height=300,
+                disabled=True,
+            )
         # Check session state directly (already initialized at top of function)
-        if not st.session_state.get("generated_subject") and not st.session_state.get(
+        elif not st.session_state.get("generated_subject") and not st.session_state.get(
             "generated_body"
         ):
-            st.markdown(
-                """
-				<div class="placeholder-container">
-					<div class="placeholder-icon">✉️</div>
-					<h3>No email generated yet</h3>
-					<p>Fill in the details on the left and click "Generate Email" to create your cold email.</p>
-				</div>
-				""",
-                unsafe_allow_html=True,
-            )
+            preview_slot.markdown(_PLACEHOLDER_HTML, unsafe_allow_html=True)
         else:
-            # Show editable fields after generation
-            # Using key parameter automatically syncs with session state (no value= needed)
-            subject_value = st.text_input("Subject", key="generated_subject")
-            body_value = st.text_area("Email body", key="generated_body", height=300)
+            # Edit subject/body inside a form so typing does not rerun the
+            # whole script on every keystroke; edits are applied on Send
+            with preview_slot.container(), st.form("edit_and_send"):
+                # Using key parameter automatically syncs with session state (no value= needed)
+                st.text_input("Subject", key="generated_subject")
+                st.text_area("Email body", key="generated_body", height=300)
+
+                # Subject/body edits only arrive on submit, so the button is
+                # only disabled when no recipient is set; emptiness is checked below
+                send_clicked = st.form_submit_button(
+                    "📧 Send Email",
+                    type="primary",
+                    key="send_email_btn",
+                    use_container_width=True,
+                    disabled=not receiver_email,
+                )
 
-            # Send button - disabled if subject or body is empty
             # Read from session state to get current values after user edits
             current_subject = st.session_state.get("generated_subject", "").strip()
             current_body = st.session_state.get("generated_body", "").strip()
             can_send = bool(current_subject and current_body and receiver_email)
 
-            if st.button(
-                "📧 Send Email",
-                type="primary",
-                key="send_email_btn",
-                use_container_width=True,
-                disabled=not can_send,
-            ):
+            if send_clicked:
                 receiver_valid, receiver_error = is_valid_email(receiver_email)
                 if not receiver_valid:
                     st.error(
@@ -427,13 +656,13 @@ def _render_email_generator() -> None:
                     st.error("Subject and body cannot be empty.")
                 else:
                     logger.info("User requested to send email to %s", receiver_email)
-                    file_to_send = st.session_state.get("uploaded_file")
+                    attachment = st.session_state.get("attachment_file")
                     current_tone = st.session_state.get("tone", "Formal")
                     _send_email_ui(
                         receiver_email,
                         current_subject,
                         current_body,
-                        file_to_send,
+                        attachment,
                         tone=current_tone,
                     )
 
@@ -445,6 +674,21 @@ def _render_email_generator() -> None:
                 elif not current_subject or not current_body:
                     st.info("💡 Subject and body must be filled to send the email.")
 
+    # Keep polling while a generation is in flight; widgets stay usable since
+    # each rerun renders the whole page before scheduling the next one
+    if "generation_future" in st.session_state:
+        time.sleep(0.25)
+        st.rerun()
+
+
+@st.cache_data(show_spinner=False)
+def _load_analytics_json(path: str, mtime: float) -> dict:
+    """Load precomputed metrics; ``mtime`` keys the cache so edits are re-read."""
+    import json
+
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
 
 def _render_analytics_dashboard() -> None:
     """Render the analytics dashboard page."""
@@ -457,10 +701,9 @@ def _render_analytics_dashboard() -> None:
     metrics = None
     if os.path.exists(analytics_file):
         try:
-            import json
-
-            with open(analytics_file, "r", encoding="utf-8") as f:
-                metrics = json.load(f)
+            metrics = _load_analytics_json(
+                analytics_file, os.path.getmtime(analytics_file)
+            )
         except Exception as e:
             logger.exception("Error reading analytics.json: %s", e)
 
@@ -504,95 +747,10 @@ def _render_analytics_dashboard() -> None:
 
 
 def main() -> None:
-    load_dotenv()
     st.set_page_config(
         page_title="AI Cold Email Generator", page_icon="📧", layout="wide"
     )
 
-    # Enhanced UI styling
-    st.markdown(
-        """
-		<style>
-		.block-container {
-			padding-top: 3rem;
-			padding-bottom: 3rem;
-		}
-		.stTextInput>div>div>input,
-		.stTextArea>div>div>textarea {
-			border-radius: 8px;
-			border: 1px solid #d0d4dc;
-			padding: 0.5rem 0.75rem;
-		}
-		[data-testid="stExpander"] {
-			border: 1px solid #e0e4e8;
-			border-radius: 8px;
-			padding: 0.5rem;
-			margin-bottom: 1rem;
-		}
-		.main-header {
-			display: flex;
-			justify-content: space-between;
-			align-items: center;
-			padding: 1.5rem 0;
-			border-bottom: 2px solid #e0e4e8;
-			margin-bottom: 2rem;
-		}
-		.header-left h1 {
-			margin: 0;
-			font-size: 2rem;
-		}
-		.header-left p {
-			margin: 0.25rem 0 0 0;
-			color: #666;
-		}
-		.github-link {
-			padding: 0.5rem 1rem;
-			background-color: #f0f0f0;
-			border-radius: 6px;
-			text-decoration: none;
-			color: #333;
-			font-size: 0.9rem;
-		}
-		.github-link:hover {
-			background-color: #e0e0e0;
-		}
-		.generate-button-container {
-			margin-top: 2rem;
-			padding: 1rem;
-			background-color: #f8f9fa;
-			border-radius: 8px;
-			border: 1px solid #e0e4e8;
-		}
-		.placeholder-container {
-			display: flex;
-			flex-direction: column;
-			align-items: center;
-			justify-content: center;
-			padding: 4rem 2rem;
-			text-align: center;
-			color: #888;
-		}
-		.placeholder-icon {
-			font-size: 4rem;
-			margin-bottom: 1rem;
-		}
-		/* Sidebar hamburger button styling */
-		[data-testid="stSidebar"] [data-testid="stHeader"] button {
-			padding: 0.5rem;
-			width: 2rem;
-			height: 2rem;
-			border: none;
-			background-color: transparent;
-		}
-		[data-testid="stSidebar"] [data-testid="stHeader"] button:hover {
-			background-color: #f0f0f0;
-			border-radius: 4px;
-		}
-		</style>
-		""",
-        unsafe_allow_html=True,
-    )
-
     # Sidebar navigation
     page = st.sidebar.radio(
         "Navigation",
@@ -602,21 +760,14 @@ def main() -> None:
 
     # Route to appropriate page
     if page == "Email Generator":
-        # Header bar
-        st.markdown(
-            """
-			<div class="main-header">
-				<div class="header-left">
-					<h1>📧 AI Cold Email Generator</h1>
-					<p>Powered by Mistral API</p>
-				</div>
-				<a href="https://github.com/Siddharth1254/ai-cold-email-generator.git" target="_blank" class="github-link">View on GitHub</a>
-			</div>
-			""",
-            unsafe_allow_html=True,
-        )
+        # Enhanced UI styling + header bar, sent as a single element. The
+        # styles are emitted on every rerun because Streamlit removes any
+        # element a rerun does not render again
+        st.markdown(_page_style() + _HEADER_HTML, unsafe_allow_html=True)
         _render_email_generator()
     elif page == "Analytics Dashboard":
+        # Enhanced UI styling
+        st.markdown(_page_style(), unsafe_allow_html=True)
         _render_analytics_dashboard()
 
 
@@ -1,23 +1,74 @@
+import atexit
+import base64
+import hashlib
 import os
 import re
-import smtplib
-from typing import BinaryIO, Optional, Tuple
-
-from email.mime.application import MIMEApplication
-from email.mime.multipart import MIMEMultipart
-from email.mime.text import MIMEText
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import TYPE_CHECKING, BinaryIO, Iterator, List, Optional, Sequence, Tuple
 
 from email_validator import EmailNotValidError, validate_email
 
 from logger import logger
 
+# smtplib and the email package are only needed for sending, so they are
+# imported where used; validation and parsing stay cheap to import
+if TYPE_CHECKING:
+	import smtplib
+	from email.mime.application import MIMEApplication
+
 
-_EMAIL_RE = re.compile(r"^[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}$")
+# Compiled once at import; a fast path that accepts plain dot-atom addresses
+# under an ordinary domain without calling email_validator. It never rejects:
+# anything it does not match (internationalised or IDN addresses, misplaced
+# dots or hyphens, reserved names) gets the authoritative check. The address
+# is split on its single "@" first, so each part is matched by a small pattern
+# whose dot-separated quantifiers cannot backtrack catastrophically. re.ASCII
+# keeps matching on the cheaper ASCII path and stops case folding from
+# admitting look-alike letters such as the Kelvin sign. The local part allows
+# the full RFC 5322 atext set, so addresses such as o'brien@example.com stay
+# on the fast path.
+_PLAIN_LOCAL_RE = re.compile(
+	r"[A-Z0-9!#$%&'*+/=?^_`{|}~-]+(?:\.[A-Z0-9!#$%&'*+/=?^_`{|}~-]+)*", re.IGNORECASE | re.ASCII
+)
+_PLAIN_DOMAIN_RE = re.compile(
+	r"(?:[A-Z0-9](?:[A-Z0-9-]{0,61}[A-Z0-9])?\.)+[A-Z]{2,24}", re.IGNORECASE | re.ASCII
+)
+# Reserved top-level names that email_validator rejects
+_SPECIAL_USE_TLDS = frozenset({"arpa", "invalid", "local", "localhost", "onion", "test"})
+_MAX_EMAIL_LENGTH = 254  # RFC 5321 path limit
+_MAX_LOCAL_LENGTH = 64  # RFC 5321 local-part limit
+_SUBJECT_PREFIX = "subject:"
+_SUBJECT_PREFIX_LEN = len(_SUBJECT_PREFIX)
+# ~64KB; a multiple of 57 bytes so every chunk encodes to whole 76-char lines
+_ATTACHMENT_CHUNK_SIZE = 57 * 1150
 
 
+@lru_cache(maxsize=512)
 def is_valid_email(email: str) -> Tuple[bool, Optional[str]]:
-	if not email or not email.strip():
+	"""Return (is_valid, error_message); results are memoized per address.
+
+	Callers pass already-trimmed input; surrounding whitespace is not stripped.
+	"""
+	if not email:
 		return False, "Email address is required."
+	if len(email) > _MAX_EMAIL_LENGTH:
+		return False, f"Email address is too long (max {_MAX_EMAIL_LENGTH} characters)."
+	# Cheap scalar checks reject most malformed input before any regex runs
+	local, sep, domain = email.partition("@")
+	if not sep or not local or not domain or "@" in domain:
+		return False, "The email address must contain a single @ between a name and a domain."
+	if (
+		len(local) <= _MAX_LOCAL_LENGTH
+		and _PLAIN_LOCAL_RE.fullmatch(local)
+		and _PLAIN_DOMAIN_RE.fullmatch(domain)
+		and domain.rpartition(".")[2].lower() not in _SPECIAL_USE_TLDS
+	):
+		return True, None
+	# Everything else gets the authoritative (and much slower) check
 	try:
 		validate_email(email, check_deliverability=False)
 		return True, None
@@ -42,25 +93,186 @@ def parse_subject_and_body(model_output: str) -> Tuple[str, str]:
 	if not text:
 		return "", ""
 
-	lines = [ln.rstrip() for ln in text.splitlines()]
-
-	subject = ""
-	body_lines: list[str] = []
-	if lines and lines[0].lower().startswith("subject:"):
-		subject = lines[0].split(":", 1)[1].strip()
-		body_lines = lines[1:]
+	# Only the first line decides the subject, so split it off without
+	# materializing (and rstrip-ing) a list of every line
+	head, _, rest = text.partition("\n")
+	head = head.strip()
+	# Compare and slice only the fixed-width prefix rather than lowercasing
+	# and splitting the whole line
+	if head[:_SUBJECT_PREFIX_LEN].lower() == _SUBJECT_PREFIX:
+		subject = head[_SUBJECT_PREFIX_LEN:].strip()
 	else:
-		# Fallback: use first non-empty line as subject, rest as body
-		for idx, ln in enumerate(lines):
-			if ln.strip():
-				subject = ln.strip()
-				body_lines = lines[idx + 1 :]
-				break
-
-	body = "\n".join(body_lines).lstrip("\n")
+		# Fallback: the first line (never empty after strip) is the subject
+		subject = head
+
+	# As before: CRLF becomes LF, trailing spaces are dropped line by line and
+	# only the blank lines before the body go, so its first-line indent stays
+	body = "\n".join([ln.rstrip() for ln in rest.splitlines()]).lstrip("\n")
 	return subject, body
 
 
+SMTP_HOST = "smtp.gmail.com"
+SMTP_PORT = 587
+# Servers drop idle sessions after a few minutes; reconnect before that
+SMTP_IDLE_TIMEOUT = 100.0  # seconds
+# Parallel connections used by send_bulk; Gmail throttles senders beyond a few
+SMTP_MAX_PARALLEL = 4
+
+
+def connect_smtp(
+	sender: str, password: str, host: str = SMTP_HOST, port: int = SMTP_PORT
+) -> "smtplib.SMTP":
+	"""Open an authenticated SMTP connection that can be reused across sends.
+
+	Raises:
+		RuntimeError: If the server cannot be reached or login fails
+	"""
+	import smtplib
+
+	server = None
+	try:
+		server = smtplib.SMTP(host, port)
+		server.starttls()
+		server.login(sender, password)
+		return server
+	except smtplib.SMTPAuthenticationError as e:
+		server.close()
+		logger.exception("SMTP authentication failed for sender %s", sender)
+		raise RuntimeError(
+			"Authentication failed. Please check your email and app password."
+		) from e
+	except (smtplib.SMTPException, OSError) as e:
+		if server is not None:
+			server.close()
+		logger.exception("Could not connect to SMTP server.")
+		raise RuntimeError(f"Failed to connect to email server: {e}") from e
+
+
+class SMTPPool:
+	"""Pool of warm, authenticated SMTP connections keyed by sender, password, host and port.
+
+	``claim`` hands out an idle connection after a NOOP health check, or opens
+	a new one; connections idle longer than ``idle_timeout`` are dropped
+	instead of being probed. A connection is returned to the pool when the
+	``with`` block exits, unless it failed with a disconnect. The password is
+	part of the key (as a keyed digest), so a changed or wrong password never
+	reuses a session that logged in with the old one.
+	"""
+
+	def __init__(
+		self,
+		host: str = SMTP_HOST,
+		port: int = SMTP_PORT,
+		idle_timeout: float = SMTP_IDLE_TIMEOUT,
+	) -> None:
+		self.host = host
+		self.port = port
+		self.idle_timeout = idle_timeout
+		self._idle: dict[tuple[str, bytes, str, int], list[tuple["smtplib.SMTP", float]]] = {}
+		self._lock = threading.Lock()
+		# Per-process key, so the pool never holds a plain hash of a password
+		self._digest_key = os.urandom(16)
+
+	@contextmanager
+	def claim(self, sender: str, password: str) -> Iterator["smtplib.SMTP"]:
+		import smtplib
+
+		credentials = hashlib.blake2b(password.encode(), key=self._digest_key, digest_size=16).digest()
+		key = (sender, credentials, self.host, self.port)
+		server = self._checkout(key) or connect_smtp(sender, password, self.host, self.port)
+		reusable = True
+		try:
+			yield server
+		except (smtplib.SMTPServerDisconnected, OSError):
+			reusable = False
+			raise
+		finally:
+			if reusable:
+				self.release(key, server)
+			else:
+				self._close(server)
+
+	def release(self, key: tuple[str, bytes, str, int], server: "smtplib.SMTP") -> None:
+		"""Return a connection to the idle pool."""
+		with self._lock:
+			self._idle.setdefault(key, []).append((server, time.monotonic()))
+
+	def close_all(self) -> None:
+		"""Quit every idle connection; registered to run at interpreter exit."""
+		with self._lock:
+			idle, self._idle = self._idle, {}
+		for entries in idle.values():
+			for server, _ in entries:
+				self._close(server)
+
+	def _checkout(self, key: tuple[str, bytes, str, int]) -> Optional["smtplib.SMTP"]:
+		"""Pop the most recently used healthy idle connection for ``key``."""
+		import smtplib
+
+		while True:
+			with self._lock:
+				entries = self._idle.get(key)
+				if not entries:
+					return None
+				server, last_used = entries.pop()
+			if time.monotonic() - last_used > self.idle_timeout:
+				self._close(server)
+				continue
+			try:
+				if server.noop()[0] == 250:
+					return server
+			except (smtplib.SMTPException, OSError):
+				pass
+			logger.info("Dropping stale SMTP connection for %s", key[0])
+			self._close(server)
+
+	@staticmethod
+	def _close(server: "smtplib.SMTP") -> None:
+		import smtplib
+
+		try:
+			server.quit()
+		except (smtplib.SMTPException, OSError):
+			server.close()
+
+
+smtp_pool = SMTPPool()
+atexit.register(smtp_pool.close_all)
+
+
+def build_attachment_part(file: BinaryIO, filename: Optional[str] = None) -> "MIMEApplication":
+	"""Encode ``file`` as a MIME attachment part.
+
+	The part can be built once and passed to several ``send_email`` calls;
+	messages only read it when they are serialized.
+
+	Raises:
+		RuntimeError: If the file cannot be read or encoded
+	"""
+	from email.encoders import encode_noop
+	from email.mime.application import MIMEApplication
+
+	try:
+		file.seek(0)
+		filename = os.path.basename(filename or getattr(file, "name", "attachment"))
+		# Base64-encode the file chunk by chunk so the raw bytes are never
+		# held in memory alongside their encoding
+		part = MIMEApplication(b"", Name=filename, _encoder=encode_noop)
+		part.set_payload(
+			"".join(
+				base64.encodebytes(chunk).decode("ascii")
+				for chunk in iter(lambda: file.read(_ATTACHMENT_CHUNK_SIZE), b"")
+			)
+		)
+		part["Content-Transfer-Encoding"] = "base64"
+		# add_header quotes or RFC 2231-encodes the name as needed
+		part.add_header("Content-Disposition", "attachment", filename=filename)
+	except Exception as e:
+		logger.exception("Failed to attach file to email.")
+		raise RuntimeError(f"Failed to attach file: {e}") from e
+	return part
+
+
 def send_email(
 	sender: str,
 	receiver: str,
@@ -68,6 +280,8 @@ def send_email(
 	body: str,
 	password: str,
 	file: Optional[BinaryIO] = None,
+	filename: Optional[str] = None,
+	attachment: Optional["MIMEApplication"] = None,
 ) -> Tuple[bool, str]:
 	"""Send an email via Gmail SMTP with optional attachment.
 	
@@ -78,6 +292,9 @@ def send_email(
 		body: Email body text
 		password: Gmail app password
 		file: Optional file attachment (BinaryIO)
+		filename: Attachment name; defaults to the basename of ``file.name``
+		attachment: Prebuilt part from ``build_attachment_part``; used instead
+			of ``file`` so repeated sends skip re-encoding
 	
 	Returns:
 		Tuple[bool, str]: True and success message, otherwise raises error.
@@ -86,6 +303,9 @@ def send_email(
 		smtplib.SMTPException: If email sending fails
 		ValueError: If email addresses are invalid
 	"""
+	import smtplib
+	from email.message import EmailMessage
+
 	valid_sender, sender_error = is_valid_email(sender)
 	if not valid_sender:
 		raise ValueError(f"Invalid sender email address: {sender_error}")
@@ -99,38 +319,27 @@ def send_email(
 	if not password:
 		raise ValueError("Password is required")
 	
-	msg = MIMEMultipart()
+	# EmailMessage sets a plain-text body directly; it only becomes
+	# multipart/mixed when there is an attachment
+	msg = EmailMessage()
 	msg["From"] = sender
 	msg["To"] = receiver
 	msg["Subject"] = subject
+	msg.set_content(body)
 	
-	msg.attach(MIMEText(body, "plain"))
-	
-	if file:
-		try:
-			file.seek(0)
-			file_data = file.read()
-			filename = os.path.basename(getattr(file, "name", "attachment"))
-			part = MIMEApplication(file_data, Name=filename)
-			part["Content-Disposition"] = f'attachment; filename="{filename}"'
-			msg.attach(part)
-			logger.info("Attached file '%s' to outgoing email.", filename)
-		except Exception as e:
-			logger.exception("Failed to attach file to email.")
-			raise RuntimeError(f"Failed to attach file: {e}") from e
+	if attachment is None and file:
+		attachment = build_attachment_part(file, filename)
+	if attachment is not None:
+		msg.make_mixed()
+		msg.attach(attachment)
+		logger.info("Attached file '%s' to outgoing email.", attachment.get_filename())
 	
 	logger.info("Sending email from %s to %s", sender, receiver)
 	try:
-		with smtplib.SMTP("smtp.gmail.com", 587) as server:
-			server.starttls()
-			server.login(sender, password)
+		# Warm connections from the pool skip the STARTTLS + AUTH handshake
+		with smtp_pool.claim(sender, password) as server:
 			server.send_message(msg)
 		return True, f"✅ Email sent successfully to {receiver}!"
-	except smtplib.SMTPAuthenticationError as e:
-		logger.exception("SMTP authentication failed for sender %s", sender)
-		raise RuntimeError(
-			"Authentication failed. Please check your email and app password."
-		) from e
 	except smtplib.SMTPRecipientsRefused as e:
 		logger.exception("SMTP recipient refused: %s", receiver)
 		raise RuntimeError(f"Invalid recipient email address: {receiver}") from e
@@ -140,7 +349,61 @@ def send_email(
 	except smtplib.SMTPException as e:
 		logger.exception("SMTP exception occurred while sending email.")
 		raise RuntimeError(f"Failed to send email: {e}") from e
+	except RuntimeError:
+		# Connection and login failures from connect_smtp are already
+		# user-facing
+		raise
 	except Exception as e:
 		logger.exception("Unexpected exception occurred while sending email.")
 		raise RuntimeError(f"Unexpected error while sending email: {e}") from e
 
+
+def send_bulk(
+	sender: str,
+	password: str,
+	messages: Sequence[Tuple[str, str, str, Optional[BinaryIO]]],
+) -> List[Tuple[bool, str]]:
+	"""Send several emails concurrently over pooled SMTP connections.
+
+	Args:
+		sender: Sender email address
+		password: Gmail app password
+		messages: (receiver, subject, body, file) tuples; file may be None
+
+	Returns:
+		List[Tuple[bool, str]]: One (ok, message) per input, in order; a
+		failed send yields False and its error instead of raising.
+	"""
+	if not messages:
+		return []
+
+	# Each distinct attachment is encoded once, under a lock, so a file shared
+	# by several messages is neither re-read nor read concurrently. A failed
+	# encoding is remembered too, and fails every message that uses the file.
+	parts: dict[int, "MIMEApplication | RuntimeError"] = {}
+	parts_lock = threading.Lock()
+
+	def attachment_for(file: BinaryIO) -> "MIMEApplication":
+		with parts_lock:
+			if id(file) not in parts:
+				try:
+					parts[id(file)] = build_attachment_part(file)
+				except RuntimeError as e:
+					parts[id(file)] = e
+			part = parts[id(file)]
+		if isinstance(part, RuntimeError):
+			raise part
+		return part
+
+	def send_one(message: Tuple[str, str, str, Optional[BinaryIO]]) -> Tuple[bool, str]:
+		receiver, subject, body, file = message
+		try:
+			return send_email(
+				sender, receiver, subject, body, password,
+				attachment=attachment_for(file) if file else None,
+			)
+		except (ValueError, RuntimeError) as e:
+			return False, str(e)
+
+	with ThreadPoolExecutor(max_workers=min(SMTP_MAX_PARALLEL, len(messages))) as executor:
+		return list(executor.map(send_one, messages))
@@ -1,13 +1,34 @@
+import asyncio
+import hashlib
+import json
 import os
+import random
+import threading
 import time
-from collections import deque
+from array import array
+from collections import OrderedDict
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Callable, Iterable
 
-import requests
 from dotenv import load_dotenv
 
 from email_utils import parse_subject_and_body
 from logger import logger
 
+# orjson is an optional, faster drop-in for encoding requests and decoding
+# responses
+try:
+    import orjson
+except ImportError:
+    orjson = None
+_json_loads = orjson.loads if orjson is not None else json.loads
+
+# requests is imported on first API call, keeping prompt/parsing helpers cheap
+# to import
+if TYPE_CHECKING:
+    import requests
+
 
 load_dotenv()
 
@@ -15,41 +36,165 @@ MISTRAL_API_KEY: str | None = os.getenv("MISTRAL_API_KEY")
 MISTRAL_MODEL: str = os.getenv("MISTRAL_MODEL", "mistral-small-latest")
 MISTRAL_CHAT_URL: str = os.getenv("MISTRAL_CHAT_URL", "https://api.mistral.ai/v1/chat/completions")
 FALLBACK_MODEL: str = os.getenv("MISTRAL_FALLBACK_MODEL", "mistral-tiny-latest")
-MAX_RETRIES: int = 3
-RETRY_DELAY: int = 5  # seconds
+MAX_RETRIES: int = 5
+RETRY_DELAY: float = 1.0  # seconds; base of the exponential backoff
+MAX_RETRY_DELAY: float = 32.0  # seconds
 FAILURE_THRESHOLD: int = 3
 FAILURE_WINDOW_SECONDS: int = 60
 CIRCUIT_BREAKER_COOLDOWN: int = 300
-
-_failure_timestamps: deque[float] = deque()
-_circuit_open_until: float = 0.0
+MAX_CONCURRENCY: int = int(os.getenv("MISTRAL_MAX_CONCURRENCY", "2"))  # parallel calls in agenerate_emails
+REQUESTS_PER_SECOND: float = float(os.getenv("MISTRAL_REQUESTS_PER_SECOND", "1"))  # client-side pacing; <= 0 disables it
+BATCH_SIZE: int = 8  # emails requested per call by generate_emails_batch
+BATCH_TOKENS_PER_EMAIL: int = 500
+RESPONSE_CACHE_SIZE: int = 128
+RESPONSE_CACHE_TTL: float = 3600.0  # seconds a cached email stays reusable
+GENERATION_TEMPERATURE: float = 0.4
+# Completions sampled above this temperature are too varied to be worth reusing
+MAX_CACHEABLE_TEMPERATURE: float = 0.7
+# Rate limits and server errors are worth retrying; other 4xx responses are not
+TRANSIENT_STATUS_CODES: frozenset[int] = frozenset({429, 500, 502, 503, 504})
+# A different model cannot fix rejected credentials
+AUTH_STATUS_CODES: frozenset[int] = frozenset({401, 403})
+# Error bodies can echo the prompt back, so only a short prefix is kept
+ERROR_BODY_MAX_CHARS: int = 200
+
+# LRU of (stored_at, (subject, body)) keyed by a digest of the request payload
+_response_cache: OrderedDict[bytes, tuple[float, tuple[str, str]]] = OrderedDict()
+_response_cache_lock = threading.Lock()
 
 # API request template
 HEADERS_TEMPLATE = {
     "Content-Type": "application/json",
 }
+# Static headers of every Mistral call, built once. They are preset on the
+# shared session, so requests through it pass no per-call headers
+REQUEST_HEADERS: dict[str, str] = (
+    {**HEADERS_TEMPLATE, "Authorization": f"Bearer {MISTRAL_API_KEY}"} if MISTRAL_API_KEY else dict(HEADERS_TEMPLATE)
+)
+
+
+def _build_session() -> "requests.Session":
+    """Create the keep-alive session shared by all Mistral calls in this process.
+
+    The adapter only retries failed connection attempts; HTTP status retries
+    are left to ``_make_api_request`` so the two never compound.
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    session = requests.Session()
+    session.headers.update(REQUEST_HEADERS)
+    adapter = HTTPAdapter(
+        pool_connections=4,
+        pool_maxsize=16,
+        max_retries=Retry(total=3, read=0, status=0, backoff_factor=0.5),
+    )
+    session.mount("https://", adapter)
+    return session
+
+
+_session: "requests.Session | None" = None
+_session_lock = threading.Lock()
+
+
+def _get_session() -> "requests.Session":
+    """Return the shared session, building it on first use."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+
+class MistralAPIError(RuntimeError):
+    """Raised when the Mistral API answers with an error status code.
+
+    The message only names the status, since it ends up in the logs; the
+    (truncated) response body is kept in ``response_body`` for callers that
+    want to inspect it.
+    """
+
+    def __init__(
+        self, message: str, status_code: int, retry_after: str | None = None, response_body: str = ""
+    ) -> None:
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+        self.response_body = response_body
 
 
-# Circuit breaker helpers
-def _ensure_circuit_allows_call() -> None:
-    """Check if circuit breaker allows API call, raise if circuit is open."""
-    now = time.time()
-    if now < _circuit_open_until:
-        wait_seconds = int(_circuit_open_until - now)
-        logger.warning("Circuit breaker active; skipping LLM call for %s more seconds.", wait_seconds)
-        raise RuntimeError("LLM temporarily unavailable due to repeated failures. Please try again later.")
-
-
-def _record_failure() -> None:
-    """Record a failure and open circuit breaker if threshold is reached."""
-    global _circuit_open_until
-    now = time.time()
-    _failure_timestamps.append(now)
-    while _failure_timestamps and now - _failure_timestamps[0] > FAILURE_WINDOW_SECONDS:
-        _failure_timestamps.popleft()
-    if len(_failure_timestamps) >= FAILURE_THRESHOLD:
-        _circuit_open_until = now + CIRCUIT_BREAKER_COOLDOWN
-        _failure_timestamps.clear()
+# Client-side rate limiting
+class _TokenBucket:
+    """Thread-safe token bucket that paces outgoing Mistral requests.
+
+    ``acquire`` reserves a token and sleeps until it is available, so bursts are
+    smoothed client-side instead of being rejected by the API with a 429.
+    A ``rate`` of 0 or less means unlimited: ``acquire`` returns at once.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+            self.last = now
+            wait = max(0.0, (1 - self.tokens) / self.rate)
+            self.tokens -= 1
+        if wait:
+            time.sleep(wait)
+
+
+_rate_limiter = _TokenBucket(rate=REQUESTS_PER_SECOND)
+
+
+# Circuit breaker
+class _CircuitBreaker:
+    """Opens for CIRCUIT_BREAKER_COOLDOWN seconds after FAILURE_THRESHOLD failures within FAILURE_WINDOW_SECONDS.
+
+    Failure times live in a fixed ring buffer (0.0 = empty slot) whose write
+    index is also the oldest entry, so tripping is an O(1) check. Mutations
+    hold the lock; ``ensure_allows_call`` reads ``_open_until`` without it,
+    since rebinding a float attribute is atomic, keeping the closed-state
+    path lock-free.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._open_until: float = 0.0
+        self._failures = array("d", [0.0] * FAILURE_THRESHOLD)
+        self._index = 0
+
+    def ensure_allows_call(self) -> None:
+        """Raise if the breaker is open."""
+        open_until = self._open_until
+        if open_until:
+            now = time.time()
+            if now < open_until:
+                wait_seconds = int(open_until - now)
+                logger.warning("Circuit breaker active; skipping LLM call for %s more seconds.", wait_seconds)
+                raise RuntimeError("LLM temporarily unavailable due to repeated failures. Please try again later.")
+
+    def record_failure(self) -> None:
+        """Record a failure and open the breaker if the threshold is reached."""
+        now = time.time()
+        with self._lock:
+            self._failures[self._index] = now
+            self._index = (self._index + 1) % FAILURE_THRESHOLD
+            oldest = self._failures[self._index]
+            if not oldest or now - oldest > FAILURE_WINDOW_SECONDS:
+                return
+            self._open_until = now + CIRCUIT_BREAKER_COOLDOWN
+            self._clear()
         logger.warning(
             "Opened LLM circuit breaker for %s seconds after %s failures within %s seconds.",
             CIRCUIT_BREAKER_COOLDOWN,
@@ -57,73 +202,234 @@ def _record_failure() -> None:
             FAILURE_WINDOW_SECONDS,
         )
 
+    def record_success(self) -> None:
+        """Forget recorded failures after a successful call."""
+        with self._lock:
+            self._clear()
 
-def _record_success() -> None:
-    """Clear failure timestamps on successful API call."""
-    if _failure_timestamps:
-        _failure_timestamps.clear()
+    def _clear(self) -> None:
+        """Empty the failure ring buffer; the caller must hold the lock."""
+        for i in range(FAILURE_THRESHOLD):
+            self._failures[i] = 0.0
+        self._index = 0
 
 
-# API request helpers
-def _make_api_request(headers: dict, payload: dict) -> requests.Response:
-    """Make API request with retry mechanism for rate limiting (429 errors)."""
-    for attempt in range(MAX_RETRIES):
-        response = requests.post(MISTRAL_CHAT_URL, headers=headers, json=payload, timeout=30)
-
-        if response.status_code == 429:
-            logger.warning(
-                "Mistral rate limit hit (attempt %s/%s). Retrying in %s seconds.",
-                attempt + 1,
-                MAX_RETRIES,
-                RETRY_DELAY,
-            )
-            if attempt < MAX_RETRIES - 1:
-                time.sleep(RETRY_DELAY)
-                continue
-            msg = f"Mistral API rate limit exceeded after {MAX_RETRIES} attempts: {response.text}"
-            logger.error(msg)
-            raise RuntimeError(msg)
+_circuit_breaker = _CircuitBreaker()
 
-        if response.status_code >= 400:
-            logger.error("Mistral API error %s: %s", response.status_code, response.text)
-            raise RuntimeError(f"Mistral API error {response.status_code}: {response.text}")
 
-        return response
+def _is_outage(exc: Exception) -> bool:
+    """Return True for failures that say the API is unhealthy: 5xx, timeouts and network errors.
 
-    logger.error("Failed to get successful response after %s attempts", MAX_RETRIES)
-    raise RuntimeError(f"Failed to get successful response after {MAX_RETRIES} attempts")
+    Client errors (other 4xx, exhausted rate limits, bad input) are not the
+    service's fault and do not count against the breaker.
+    """
+    import requests
 
+    status_code = getattr(exc, "status_code", None)
+    if status_code is not None:
+        return status_code >= 500
+    return isinstance(exc, (requests.ConnectionError, requests.Timeout))
 
-def _invoke_with_fallback(headers: dict, payload: dict) -> requests.Response:
-    """Invoke API with fallback model on failure."""
-    _ensure_circuit_allows_call()
-    try:
-        response = _make_api_request(headers, payload)
-        _record_success()
+
+# Request body helpers
+def _encode_payload(payload: dict) -> bytes:
+    """Serialize a request payload to the compact JSON bytes sent to the API."""
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def _with_stream_flag(request_body: bytes) -> bytes:
+    """Return an encoded payload with ``"stream": true`` appended, without re-encoding it."""
+    return request_body[:-1] + b',"stream":true}'
+
+
+# Response cache helpers
+def _cache_key(payload: dict, request_body: bytes) -> bytes | None:
+    """Return a digest of the encoded (non-streaming) payload, or None if the output should not be cached.
+
+    Payloads are built in a fixed field order, so equal requests encode to
+    equal bytes; high-temperature payloads are not cached at all.
+    """
+    if payload.get("temperature", 0.0) > MAX_CACHEABLE_TEMPERATURE:
+        return None
+    return hashlib.blake2b(request_body, digest_size=16).digest()
+
+
+def _cache_get(key: bytes) -> tuple[str, str] | None:
+    """Return a cached (subject, body) and mark it most recently used.
+
+    Entries older than RESPONSE_CACHE_TTL or missing a subject or body are
+    evicted on lookup and treated as misses.
+    """
+    with _response_cache_lock:
+        entry = _response_cache.get(key)
+        if entry is None:
+            return None
+        stored_at, value = entry
+        if time.monotonic() - stored_at > RESPONSE_CACHE_TTL or not all(value):
+            del _response_cache[key]
+            return None
+        _response_cache.move_to_end(key)
+        return value
+
+
+def _cache_put(key: bytes, value: tuple[str, str]) -> None:
+    """Store a generated (subject, body), evicting the least recently used entry."""
+    if not all(value):
+        return
+    with _response_cache_lock:
+        _response_cache[key] = (time.monotonic(), value)
+        _response_cache.move_to_end(key)
+        while len(_response_cache) > RESPONSE_CACHE_SIZE:
+            _response_cache.popitem(last=False)
+
+
+# API request helpers
+def _retry_delay(retry_after: str | None, attempt: int) -> float:
+    """Return how long to wait before retrying a transient failure.
+
+    A numeric ``Retry-After`` header value from the server wins; otherwise the
+    delay doubles per attempt (1s, 2s, 4s, ...) and is scaled by a random
+    0.5-1.0 factor so concurrent clients spread out.
+    """
+    if retry_after:
+        try:
+            return min(max(float(retry_after), 0.0), MAX_RETRY_DELAY)
+        except ValueError:
+            pass  # HTTP-date form; fall back to backoff
+    return min(RETRY_DELAY * 2**attempt, MAX_RETRY_DELAY) * random.uniform(0.5, 1.0)
+
+
+def _make_api_request(
+    headers: dict | None, payload: dict, session: "requests.Session | None" = None, request_body: bytes | None = None
+) -> "requests.Response":
+    """Send one chat completion request, raising MistralAPIError on an error status.
+
+    Requests go through the pooled module session (or ``session``), so keep-alive
+    connections are reused instead of paying a TCP/TLS handshake per call.
+    ``headers`` are only needed for a custom ``session``; the module session
+    already carries them. ``request_body`` is the already-encoded ``payload``, if the
+    caller has it. Calls are paced by the module token bucket
+    (MISTRAL_REQUESTS_PER_SECOND) so bursts wait locally rather than drawing
+    429s. Retrying is left to ``_invoke_with_fallback``.
+    """
+    http = session or _get_session()
+    if request_body is None:
+        request_body = _encode_payload(payload)
+    _rate_limiter.acquire()
+    response = http.post(
+        MISTRAL_CHAT_URL, headers=headers, data=request_body, timeout=30, stream=payload.get("stream", False)
+    )
+    if response.status_code >= 400:
+        error = MistralAPIError(
+            f"Mistral API error {response.status_code}",
+            response.status_code,
+            response.headers.get("Retry-After"),
+            response.text[:ERROR_BODY_MAX_CHARS],
+        )
+        response.close()
+        raise error
+    return response
+
+
+def _invoke_with_fallback(
+    headers: dict | None, payload: dict, session: "requests.Session | None" = None, request_body: bytes | None = None
+) -> "requests.Response":
+    """Invoke the API on a single retry ladder that falls back to FALLBACK_MODEL.
+
+    The first attempt uses the payload's model and every later one the
+    fallback model. Transient failures (429, 5xx, network errors) back off
+    before the next attempt, up to MAX_RETRIES attempts in total; other
+    errors get one immediate try on the fallback model, and rejected
+    credentials are never retried. The circuit breaker is checked once and
+    records at most one failure per call.
+    """
+    import requests
+
+    _circuit_breaker.ensure_allows_call()
+    for attempt in range(1, MAX_RETRIES + 1):
+        try:
+            response = _make_api_request(headers, payload, session, request_body)
+        except (MistralAPIError, requests.ConnectionError, requests.Timeout) as exc:
+            status_code = getattr(exc, "status_code", None)
+            transient = status_code is None or status_code in TRANSIENT_STATUS_CODES
+            can_fall_back = payload.get("model") != FALLBACK_MODEL
+            if status_code in AUTH_STATUS_CODES or attempt == MAX_RETRIES or not (transient or can_fall_back):
+                logger.error("Mistral request for model %s failed after %s attempt(s): %s", payload.get("model"), attempt, exc)
+                if _is_outage(exc):
+                    _circuit_breaker.record_failure()
+                raise
+            if can_fall_back:
+                logger.warning("Model %s failed (%s); switching to fallback model %s", payload.get("model"), exc, FALLBACK_MODEL)
+                payload = {**payload, "model": FALLBACK_MODEL}
+                request_body = _encode_payload(payload)
+            if transient:
+                wait = _retry_delay(getattr(exc, "retry_after", None), attempt - 1)
+                logger.warning(
+                    "Mistral request failed (attempt %s/%s). Retrying in %.1f seconds.", attempt, MAX_RETRIES, wait
+                )
+                time.sleep(wait)
+            continue
+        _circuit_breaker.record_success()
         return response
-    except Exception:
-        logger.exception("Primary model %s failed.", payload.get("model"))
-        _record_failure()
-        if payload.get("model") != FALLBACK_MODEL:
-            fallback_payload = dict(payload)
-            fallback_payload["model"] = FALLBACK_MODEL
-            logger.warning("Trying fallback model %s", FALLBACK_MODEL)
-            _ensure_circuit_allows_call()
+    # Unreachable: the last attempt either returns or re-raises its error
+
+
+def _read_message(response: "requests.Response") -> str:
+    """Return the stripped message content of a non-streamed completion."""
+    data = _json_loads(response.content)
+    try:
+        return data["choices"][0]["message"]["content"].strip()
+    except Exception as exc:  # noqa: BLE001
+        logger.exception("Unexpected response format from Mistral during job email generation.")
+        raise RuntimeError(f"Unexpected Mistral response format: {str(data)[:ERROR_BODY_MAX_CHARS]!r}") from exc
+
+
+def _read_stream(
+    response: "requests.Response",
+    on_delta: Callable[[str], None] | None,
+    on_subject: Callable[[str], None] | None = None,
+) -> str:
+    """Collect the content of a streamed (SSE) completion, passing each delta to ``on_delta``.
+
+    ``on_subject`` is called once with the parsed subject as soon as the
+    first line of the email is complete, before the body has arrived.
+    """
+    parts: list[str] = []
+    subject_pending = on_subject is not None
+    with response:
+        for line in response.iter_lines():
+            if not line.startswith(b"data: "):
+                continue
+            data = line[len(b"data: "):]
+            if data == b"[DONE]":
+                break
             try:
-                response = _make_api_request(headers, fallback_payload)
-                _record_success()
-                return response
-            except Exception:
-                logger.exception("Fallback model %s also failed.", FALLBACK_MODEL)
-                _record_failure()
-                raise
-        raise
+                delta = _json_loads(data)["choices"][0]["delta"].get("content")
+            except Exception as exc:  # noqa: BLE001
+                logger.exception("Unexpected stream event from Mistral during job email generation.")
+                raise RuntimeError(f"Unexpected Mistral stream event: {data[:ERROR_BODY_MAX_CHARS]!r}") from exc
+            if delta:
+                parts.append(delta)
+                if on_delta is not None:
+                    on_delta(delta)
+                # The subject line is done once a newline follows some text
+                if subject_pending and "\n" in delta:
+                    text = "".join(parts).lstrip()
+                    if "\n" in text:
+                        subject_pending = False
+                        on_subject(parse_subject_and_body(text)[0])
+    content = "".join(parts).strip()
+    if subject_pending and content:
+        on_subject(parse_subject_and_body(content)[0])
+    return content
 
 
 # Prompt helper functions
-def _system_prompt(sender_name: str) -> str:
-    """Return clean system instructions controlling tone, structure, constraints."""
-    return f"""You write concise, polite job/internship outreach emails that are professional, personalized, and specific.
+# Placeholder for the sender's name in the otherwise fixed system prompt
+_SENDER_SLOT = "\x00SENDER\x00"
+_SYSTEM_PROMPT_TEMPLATE = """You write concise, polite job/internship outreach emails that are professional, personalized, and specific.
 
 Requirements:
 • Keep body under 140 words
@@ -135,7 +441,7 @@ Requirements:
 • Propose a simple next step (e.g., brief call or sharing a portfolio)
 • Maximum 2 short paragraphs
 • Do not use brackets, placeholders, or template markers
-• End the email with the exact signature: 'Best, {sender_name}' — do NOT output placeholders or brackets. Use the exact sender_name value provided. Never use '[Your Name]', '[Name]', or any placeholder text for the signature.
+• End the email with the exact signature: 'Best, \x00SENDER\x00' — do NOT output placeholders or brackets. Use the exact sender_name value provided. Never use '[Your Name]', '[Name]', or any placeholder text for the signature.
 
 Guardrails:
 • Do not invent roles, skills, or achievements that were not provided
@@ -185,6 +491,54 @@ Subject: <one-line subject>
 <body paragraphs>"""
 
 
+def _system_prompt(sender_name: str) -> str:
+    """Return clean system instructions controlling tone, structure, constraints."""
+    return _SYSTEM_PROMPT_TEMPLATE.replace(_SENDER_SLOT, sender_name)
+
+
+@lru_cache(maxsize=16)
+def _system_message(sender_name: str) -> dict[str, str]:
+    """Return the system chat message for ``sender_name``, built once per sender.
+
+    The same dict is placed in every payload for that sender; payloads are
+    only serialized, never mutated, so sharing it is safe.
+    """
+    return {"role": "system", "content": _system_prompt(sender_name)}
+
+
+# Structure and personalization rules shared by single and batch prompts
+_EMAIL_RULES = "\n".join([
+    "",
+    "Email structure:",
+    "1. One-sentence opening with purpose",
+    "2. One short paragraph with personalization",
+    "3. One short paragraph with the sender's relevant strength",
+    "4. One-sentence CTA",
+    "5. Signature",
+    "",
+    "Each section must be separated by a blank line.",
+    "",
+    "Personalization rules:",
+    "• Only include optional fields if they fit naturally",
+    "• Do not force details into the first sentence",
+    "• Company insight should be 1 sentence max",
+    "• One-liner (strength) must be integrated into the body, not the subject line",
+    "• \"How found\" must appear late in the email, never in the opening line",
+])
+
+
+@lru_cache(maxsize=16)
+def _user_prompt_trailer(tone: str) -> str:
+    """Return the fixed structure/personalization rules closing every user prompt."""
+    return "\n".join([
+        _EMAIL_RULES,
+        "",
+        f"Tone selected: {tone}. Use this tone consistently.",
+        "",
+        "Make sure the email feels tailored to this scenario and expresses genuine interest.",
+    ])
+
+
 def _user_prompt(
     sender_name: str,
     sender_email: str,
@@ -198,63 +552,19 @@ def _user_prompt(
     tone: str = "Formal",
 ) -> str:
     """Return user-specific structured email context with optional fields included only when present."""
-    lines = [
-        "Write a short, polite cold email with the following details:",
-        "",
-        "Sender name:",
-        sender_name,
-        "",
-        "Sender email:",
-        sender_email,
-        "",
-        "Recipient email:",
-        receiver_email,
-        "",
-        "Company:",
-        company,
-        "",
-        "Role:",
-        role,
-    ]
-    
-    if position:
-        lines.extend([
-            "",
-            "Position:",
-            position,
-        ])
-    
+    position_block = f"\n\nPosition:\n{position}" if position else ""
     optional_details = _format_optional_details(how_found, one_liner, company_note)
-    if optional_details:
-        lines.extend([
-            "",
-            optional_details,
-        ])
-    
-    lines.extend([
-        "",
-        "Email structure:",
-        "1. One-sentence opening with purpose",
-        "2. One short paragraph with personalization",
-        "3. One short paragraph with the sender's relevant strength",
-        "4. One-sentence CTA",
-        "5. Signature",
-        "",
-        "Each section must be separated by a blank line.",
-        "",
-        "Personalization rules:",
-        "• Only include optional fields if they fit naturally",
-        "• Do not force details into the first sentence",
-        "• Company insight should be 1 sentence max",
-        "• One-liner (strength) must be integrated into the body, not the subject line",
-        "• \"How found\" must appear late in the email, never in the opening line",
-        "",
-        f"Tone selected: {tone}. Use this tone consistently.",
-        "",
-        "Make sure the email feels tailored to this scenario and expresses genuine interest.",
-    ])
-    
-    return "\n".join(lines)
+    details_block = f"\n\n{optional_details}" if optional_details else ""
+    # One f-string builds the prompt without an intermediate list of lines
+    return (
+        "Write a short, polite cold email with the following details:\n"
+        f"\nSender name:\n{sender_name}\n"
+        f"\nSender email:\n{sender_email}\n"
+        f"\nRecipient email:\n{receiver_email}\n"
+        f"\nCompany:\n{company}\n"
+        f"\nRole:\n{role}"
+        f"{position_block}{details_block}\n{_user_prompt_trailer(tone)}"
+    )
 
 
 def _sanitize_optional_field(value: str | None) -> str | None:
@@ -301,9 +611,23 @@ def generate_email(
     one_liner: str | None = None,
     company_note: str | None = None,
     tone: str = "Formal",
+    session: "requests.Session | None" = None,
+    seed: int | None = None,
+    on_delta: Callable[[str], None] | None = None,
+    on_subject: Callable[[str], None] | None = None,
 ) -> dict[str, str]:
     """Generate a professional job/internship cold email using Mistral API.
 
+    Calls share a pooled keep-alive session unless ``session`` overrides it.
+    Requests whose payload (prompts, model, sampling settings) matches one
+    from the last hour are answered from an in-process LRU cache without
+    calling the API. A ``seed`` is sent as Mistral's ``random_seed`` so
+    different seeds yield distinct variants.
+    With ``on_delta`` the completion is streamed and each text fragment is
+    passed to it as it arrives. ``on_subject`` (which also enables streaming)
+    receives the subject as soon as its line is complete, ahead of the body.
+    Cache hits return without calling either.
+
     Returns a dict with keys: "subject" and "body".
     """
     logger.info(
@@ -323,13 +647,8 @@ def generate_email(
     one_liner = _sanitize_optional_field(one_liner)
     company_note = _sanitize_optional_field(company_note)
 
-    headers = {
-        **HEADERS_TEMPLATE,
-        "Authorization": f"Bearer {MISTRAL_API_KEY}",
-    }
-
     messages = [
-        {"role": "system", "content": _system_prompt(sender_name)},
+        _system_message(sender_name),
         {
             "role": "user",
             "content": _user_prompt(
@@ -350,19 +669,157 @@ def generate_email(
     payload = {
         "model": MISTRAL_MODEL,
         "messages": messages,
-        "temperature": 0.4,
+        "temperature": GENERATION_TEMPERATURE,
         "max_tokens": 450,
     }
+    if seed is not None:
+        payload["random_seed"] = seed
+
+    request_body = _encode_payload(payload)
+    cache_key = _cache_key(payload, request_body)
+    cached = _cache_get(cache_key) if cache_key is not None else None
+    if cached is not None:
+        logger.info("generate_email cache hit for company=%s role=%s", company, role)
+        subject, body = cached
+        return {"subject": subject, "body": body}
+
+    stream = on_delta is not None or on_subject is not None
+    if stream:
+        payload["stream"] = True
+        request_body = _with_stream_flag(request_body)
+
+    headers = None if session is None else REQUEST_HEADERS
+    response = _invoke_with_fallback(headers, payload, session, request_body)
+    if stream:
+        content = _read_stream(response, on_delta, on_subject)
+    else:
+        content = _read_message(response)
+
+    subject, body = parse_subject_and_body(content)
+    if cache_key is not None:
+        _cache_put(cache_key, (subject, body))
+    return {"subject": subject, "body": body}
+
+
+def _batch_system_prompt(sender_name: str) -> str:
+    """Return the system prompt with its output format replaced by a JSON envelope."""
+    rules = _system_prompt(sender_name).rpartition("Output format:")[0]
+    return rules + (
+        'Output format:\n'
+        'A JSON object {"emails": [{"subject": "<one-line subject>", "body": "<body paragraphs>"}, ...]} '
+        "with one entry per requested email, in request order."
+    )
+
 
-    response = _invoke_with_fallback(headers, payload)
-    data = response.json()
+def _batch_user_prompt(items: list[dict]) -> str:
+    """Return one user message describing every email of a batch as a JSON array."""
+    return "\n".join([
+        f"Write {len(items)} short, polite cold emails, one for each request in this JSON array:",
+        "",
+        json.dumps(items, ensure_ascii=False),
+        _EMAIL_RULES,
+        "",
+        "Use each request's tone consistently within its email.",
+        "",
+        "Make sure every email feels tailored to its scenario and expresses genuine interest.",
+    ])
+
+
+def _generate_batch_chunk(items: list[dict]) -> list[dict[str, str]]:
+    """Generate the emails for up to BATCH_SIZE requests in a single API call."""
+    sender_names = {item.get("sender_name") for item in items}
+    if len(sender_names) != 1 or not next(iter(sender_names)):
+        raise ValueError("Every batch item needs the same non-empty sender_name")
+    requests_json = []
+    for item in items:
+        request = {
+            "sender_email": item["sender_email"],
+            "recipient_email": item["receiver_email"],
+            "company": item["company"],
+            "role": item["role"],
+            "tone": item.get("tone", "Formal"),
+        }
+        for name in ("position", "how_found", "one_liner", "company_note"):
+            value = _sanitize_optional_field(item.get(name))
+            if value:
+                request[name] = value
+        requests_json.append(request)
+
+    payload = {
+        "model": MISTRAL_MODEL,
+        "messages": [
+            {"role": "system", "content": _batch_system_prompt(next(iter(sender_names)))},
+            {"role": "user", "content": _batch_user_prompt(requests_json)},
+        ],
+        "temperature": GENERATION_TEMPERATURE,
+        "max_tokens": BATCH_TOKENS_PER_EMAIL * len(items),
+        "response_format": {"type": "json_object"},
+    }
+    response = _invoke_with_fallback(None, payload)
+    content = _read_message(response)
     try:
-        content: str = data["choices"][0]["message"]["content"].strip()
+        emails = _json_loads(content)["emails"]
+        results = [{"subject": email["subject"].strip(), "body": email["body"].strip()} for email in emails]
     except Exception as exc:  # noqa: BLE001
-        logger.exception("Unexpected response format from Mistral during job email generation.")
-        raise RuntimeError(f"Unexpected Mistral response format: {data}") from exc
+        logger.exception("Unexpected batch response format from Mistral.")
+        raise RuntimeError(f"Unexpected Mistral batch response format: {content[:ERROR_BODY_MAX_CHARS]!r}") from exc
+    if len(results) != len(items) or not all(r["subject"] and r["body"] for r in results):
+        raise RuntimeError(f"Mistral returned {len(results)} usable emails for a batch of {len(items)}")
+    logger.info("Generated %d emails in one batch request", len(results))
+    return results
+
+
+def generate_emails_batch(items: list[dict], batch_size: int = BATCH_SIZE) -> list[dict[str, str]]:
+    """Generate many emails with one Mistral call per ``batch_size`` of them.
+
+    Each item takes the same keyword arguments as ``generate_email``; all
+    items must share one ``sender_name`` since it is fixed in the system
+    prompt. The model answers in JSON mode with every email of its chunk,
+    trading N round-trips for one. Chunks run concurrently, up to
+    MAX_CONCURRENCY at a time, and results keep the order of ``items``.
+    Responses are not cached.
+
+    Raises:
+        ValueError: If the items do not share a sender name
+        RuntimeError: If an API call fails or returns the wrong number of emails
+    """
+    if not MISTRAL_API_KEY:
+        raise RuntimeError("MISTRAL_API_KEY is not set. Add it to your .env file.")
+    chunks = [items[i : i + batch_size] for i in range(0, len(items), batch_size)]
+    if not chunks:
+        return []
+    with ThreadPoolExecutor(max_workers=min(MAX_CONCURRENCY, len(chunks))) as executor:
+        return [email for chunk in executor.map(_generate_batch_chunk, chunks) for email in chunk]
 
-    subject, body = parse_subject_and_body(content)
-    logger.info(f"Email generated | tone={tone}")
-    return {"subject": subject, "body": body}
 
+async def agenerate_email(*args, **kwargs) -> dict[str, str]:
+    """Async counterpart of ``generate_email``; takes the same arguments.
+
+    Batches can be issued with ``asyncio.gather(*(agenerate_email(...) for ...))``
+    so their Mistral round-trips overlap. The blocking call runs in a worker
+    thread via ``asyncio.to_thread``; concurrent calls share the pooled session,
+    response cache and circuit breaker with the sync path.
+    """
+    return await asyncio.to_thread(generate_email, *args, **kwargs)
+
+
+async def agenerate_emails(
+    batch: Iterable[dict],
+    max_concurrency: int = MAX_CONCURRENCY,
+    generate: Callable[..., dict[str, str]] = generate_email,
+) -> list[dict[str, str] | BaseException]:
+    """Generate one email per keyword-argument dict in ``batch``, concurrently.
+
+    At most ``max_concurrency`` calls are in flight at once, keeping bursts
+    under the provider's rate limit. Results come back in input order; a
+    failed generation is returned as its exception instead of cancelling the
+    rest of the batch. ``generate`` is called in a worker thread for each
+    item; callers can pass a wrapper of ``generate_email`` (e.g. a cached one).
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def generate_one(kwargs: dict) -> dict[str, str]:
+        async with semaphore:
+            return await asyncio.to_thread(generate, **kwargs)
+
+    return await asyncio.gather(*(generate_one(kwargs) for kwargs in batch), return_exceptions=True)
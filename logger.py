@@ -1,29 +1,67 @@
+import atexit
 import logging
 import os
-from logging.handlers import RotatingFileHandler
+import queue
+import threading
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 
 
 LOG_DIR = "logs"
 LOG_FILE = os.path.join(LOG_DIR, "app.log")
+# Standard level name (DEBUG, INFO, WARNING, ...) or OFF to disable logging
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
 
-os.makedirs(LOG_DIR, exist_ok=True)
+_FORMAT = "%(asctime)s | %(levelname)s | %(name)s | %(message)s"
+_configure_lock = threading.Lock()
 
-logger = logging.getLogger("ai_cold_email_generator")
-if not logger.handlers:
-	logger.setLevel(logging.INFO)
 
-	formatter = logging.Formatter(
-		"%(asctime)s | %(levelname)s | %(name)s | %(message)s"
-	)
+def _configure() -> list:
+	"""Create the log directory and the file/console handlers, once.
 
-	file_handler = RotatingFileHandler(LOG_FILE, maxBytes=1_000_000, backupCount=3)
-	file_handler.setFormatter(formatter)
+	Runs when the first record is emitted, so importing this module does no
+	filesystem work. The logger itself only gets a QueueHandler: callers
+	enqueue records and return, while a QueueListener thread does the disk
+	and console writes. The handler list is swapped in one assignment, so
+	threads logging at the same time never see it half-updated.
+	"""
+	with _configure_lock:
+		if not isinstance(logger.handlers[0], _DeferredSetupHandler):
+			return logger.handlers
 
-	console_handler = logging.StreamHandler()
-	console_handler.setFormatter(formatter)
+		os.makedirs(LOG_DIR, exist_ok=True)
+		formatter = logging.Formatter(_FORMAT)
 
-	logger.addHandler(file_handler)
-	logger.addHandler(console_handler)
-	logger.propagate = False
+		file_handler = RotatingFileHandler(LOG_FILE, maxBytes=1_000_000, backupCount=3)
+		file_handler.setFormatter(formatter)
+
+		console_handler = logging.StreamHandler()
+		console_handler.setFormatter(formatter)
+
+		log_queue: queue.Queue = queue.Queue(-1)
+		listener = QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+		listener.start()
+		# Stopping drains the queue, so records logged just before exit are kept
+		atexit.register(listener.stop)
+
+		logger.handlers = [QueueHandler(log_queue)]
+		return logger.handlers
 
 
+class _DeferredSetupHandler(logging.Handler):
+	"""Stand-in handler that sets up the real ones when a record first arrives."""
+
+	def emit(self, record: logging.LogRecord) -> None:
+		for handler in _configure():
+			if record.levelno >= handler.level:
+				handler.handle(record)
+
+
+logger = logging.getLogger("ai_cold_email_generator")
+if not logger.handlers:
+	if LOG_LEVEL == "OFF":
+		logger.disabled = True
+	else:
+		level = logging.getLevelName(LOG_LEVEL)
+		logger.setLevel(level if isinstance(level, int) else logging.INFO)
+	logger.addHandler(_DeferredSetupHandler())
+	logger.propagate = False
@@ -0,0 +1,83 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Sequence
+
+from logger import LOG_DIR, logger
+
+
+# Disk-backed store of generated emails, keyed by their exact form inputs. The
+# in-process caches (the LRU in generate_email and Streamlit's st.cache_data)
+# are lost on every restart and are not shared between server processes; this
+# store keeps a result for MAX_AGE_SECONDS across both. Rows are keyed by a
+# digest of the inputs, so recipient addresses and the other form fields are
+# never written to disk in clear; only the generated subject and body are.
+PERSISTENT_CACHE_PATH: str = os.getenv("PERSISTENT_CACHE_PATH", os.path.join(LOG_DIR, "persistent_cache.db"))
+MAX_AGE_SECONDS: float = float(os.getenv("PERSISTENT_CACHE_TTL", str(7 * 86400)))
+
+_connection: sqlite3.Connection | None = None
+_connection_lock = threading.Lock()
+
+
+def _connect() -> sqlite3.Connection:
+    """Open the cache database on first use; the caller must hold ``_connection_lock``."""
+    global _connection
+    if _connection is None:
+        os.makedirs(os.path.dirname(PERSISTENT_CACHE_PATH) or ".", exist_ok=True)
+        _connection = sqlite3.connect(PERSISTENT_CACHE_PATH, check_same_thread=False)
+        _connection.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key BLOB PRIMARY KEY, subject TEXT NOT NULL, body TEXT NOT NULL, created REAL NOT NULL)"
+        )
+        _connection.commit()
+    return _connection
+
+
+def _key(fields: Sequence[str | None]) -> bytes:
+    """Digest ``fields`` with only case and whitespace folded.
+
+    The fields are encoded as a JSON list, so values containing separators can
+    never run into a neighbouring field, and punctuation ("C++", "$30M", "-5%")
+    always counts.
+    """
+    folded = [" ".join(value.split()).casefold() if value else None for value in fields]
+    return hashlib.blake2b(json.dumps(folded).encode(), digest_size=16).digest()
+
+
+def get(fields: Sequence[str | None]) -> tuple[str, str] | None:
+    """Return the stored (subject, body) for ``fields``, if younger than MAX_AGE_SECONDS."""
+    try:
+        with _connection_lock:
+            row = _connect().execute(
+                "SELECT subject, body FROM responses WHERE key = ? AND created >= ?",
+                (_key(fields), time.time() - MAX_AGE_SECONDS),
+            ).fetchone()
+    except sqlite3.Error:
+        logger.exception("Persistent cache lookup failed.")
+        return None
+
+    if row is not None:
+        logger.info("Persistent cache hit")
+    return row
+
+
+def put(fields: Sequence[str | None], subject: str, body: str) -> None:
+    """Store a generated (subject, body) for ``fields``.
+
+    Expired entries are pruned here, so the table only grows with recent use.
+    """
+    now = time.time()
+    try:
+        with _connection_lock:
+            connection = _connect()
+            connection.execute("DELETE FROM responses WHERE created < ?", (now - MAX_AGE_SECONDS,))
+            connection.execute(
+                "INSERT OR REPLACE INTO responses (key, subject, body, created) VALUES (?, ?, ?, ?)",
+                (_key(fields), subject, body, now),
+            )
+            connection.commit()
+    except sqlite3.Error:
+        logger.exception("Persistent cache write failed.")